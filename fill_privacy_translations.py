@@ -2,12 +2,14 @@
 # -*- coding: utf-8 -*-
 """
 Fill Privacy Policy translations for all languages
+
+The merge itself lives in i18n_tools; extra namespaces can be patched from
+JSON files with --patch, e.g.
+    python fill_privacy_translations.py merge --patch terms.json
 """
-import json
+import sys
 
-# Read English as reference
-with open('src/lib/i18n/translations/en.json', 'r', encoding='utf-8') as f:
-    en_data = json.load(f)
+from i18n_tools.cli import main
 
 # Comprehensive Privacy Policy translations
 privacy_translations = {
@@ -118,25 +120,9 @@ privacy_translations = {
     }
 }
 
-# Update all language files
-for lang in ['fr', 'ar', 'hi']:
-    file_path = f'src/lib/i18n/translations/{lang}.json'
-    
-    with open(file_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    
-    # Update privacy translations
-    if lang in privacy_translations:
-        if 'privacy' not in data:
-            data['privacy'] = {}
-        for key, value in privacy_translations[lang].items():
-            data['privacy'][key] = value
-    
-    with open(file_path, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
-    
-    print(f"{lang.upper()} Privacy translations updated!")
-
-print("Privacy translations for FR and AR completed!")
-print("Note: HI, ES, ZH, PT translations will be added in next step due to length.")
+PATCHES = {
+    'privacy': privacy_translations,
+}
 
+if __name__ == '__main__':
+    sys.exit(main(builtin_patches=PATCHES))
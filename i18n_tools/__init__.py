@@ -0,0 +1,3 @@
+"""
+Translation tooling for the locale catalogs in src/lib/i18n/translations
+"""
@@ -0,0 +1,137 @@
+"""
+Benchmarks for the translation pipeline
+
+Synthetic catalogs are generated at multiples of the real ones by repeating
+every namespace under suffixed names, so key shapes, string lengths and
+scripts stay realistic. Each scale runs in a fresh process, which keeps its
+peak RSS separate from the others, and every stage is timed best-of-N.
+The report is plain JSON meant to be diffed between versions.
+"""
+import json
+import multiprocessing
+import platform
+import shutil
+import tempfile
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from .catalog import BASE_LOCALE, TRANSLATIONS_DIR, dump_catalog, flatten, load_catalog, locale_path
+from .merge import apply_namespaces
+from .profiling import StageTimer, peak_rss_bytes
+from .stream import patch_file
+from .validate import validate_all
+
+BENCH_VERSION = 1
+DEFAULT_SCALES = (1, 10, 100)
+DEFAULT_REPEAT = 3
+# Share of keys per namespace that the synthetic patch rewrites
+PATCH_EVERY = 10
+
+
+def synthesize(data, scale):
+    """Repeat every namespace `scale` times: common, common_1, common_2, ..."""
+    return {
+        f'{namespace}_{copy}' if copy else namespace: value
+        for copy in range(scale)
+        for namespace, value in data.items()
+    }
+
+
+def synthetic_patch(data, locale):
+    """Rewrite every PATCH_EVERY-th string of each namespace."""
+    patch = {}
+    for namespace, values in data.items():
+        if not isinstance(values, dict):
+            continue
+        for position, (key, value) in enumerate(flatten(values)):
+            if position % PATCH_EVERY == 0 and isinstance(value, str) and '.' not in key:
+                patch.setdefault(namespace, {})[key] = f'{value} [{locale}]'
+    return patch
+
+
+def generate_catalogs(directory, scale, locales, source_dir=TRANSLATIONS_DIR):
+    for locale in locales:
+        data = synthesize(load_catalog(locale_path(locale, source_dir)), scale)
+        locale_path(locale, directory).write_text(dump_catalog(data, trailing_newline=True), encoding='utf-8')
+
+
+def _best(samples):
+    return {name: round(min(sample[name] for sample in samples), 3) for name in samples[0]}
+
+
+def bench_scale(scale, locales, source_dir=TRANSLATIONS_DIR, repeat=DEFAULT_REPEAT, trace_memory=False):
+    """Time every pipeline stage over synthetic catalogs at `scale`."""
+    work_dir = Path(tempfile.mkdtemp(prefix=f'i18n-bench-{scale}x-'))
+    try:
+        generate_catalogs(work_dir, scale, locales, source_dir)
+        sizes = {locale: locale_path(locale, work_dir).stat().st_size for locale in locales}
+        base_keys = sum(1 for _ in flatten(load_catalog(locale_path(BASE_LOCALE, work_dir))))
+
+        if trace_memory:
+            tracemalloc.start()
+
+        samples = []
+        written = {}
+        for _ in range(repeat):
+            timer = StageTimer()
+            for locale in locales:
+                path = locale_path(locale, work_dir)
+                with timer.stage('load'):
+                    data = load_catalog(path)
+                patch = synthetic_patch(data, locale)
+                with timer.stage('merge'):
+                    apply_namespaces(data, patch)
+                with timer.stage('serialize'):
+                    encoded = dump_catalog(data, trailing_newline=True).encode('utf-8')
+                with timer.stage('write'):
+                    (work_dir / f'{locale}.out.json').write_bytes(encoded)
+                with timer.stage('streamingPatch'):
+                    streamed = patch_file(path, patch)
+                written[locale] = {'serialized': len(encoded), 'streaming': streamed}
+                # Undo the in-place streaming patch for the next round
+                generate_catalogs(work_dir, scale, [locale], source_dir)
+            with timer.stage('validate'):
+                validate_all(locales, directory=work_dir)
+            samples.append(timer.as_dict())
+
+        result = {
+            'scale': scale,
+            'baseKeys': base_keys,
+            'stagesMs': _best(samples),
+            'peakRssBytes': peak_rss_bytes(),
+            'locales': {
+                locale: {'sourceBytes': sizes[locale], 'bytesWritten': written[locale]['serialized'],
+                         'streamingBytesWritten': written[locale]['streaming']}
+                for locale in locales
+            },
+        }
+        if trace_memory:
+            result['tracemallocPeakBytes'] = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        return result
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def run_benchmarks(locales, scales=DEFAULT_SCALES, source_dir=TRANSLATIONS_DIR, repeat=DEFAULT_REPEAT,
+                   trace_memory=False):
+    results = []
+    context = multiprocessing.get_context('spawn')
+    for scale in scales:
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+            results.append(pool.submit(bench_scale, scale, locales, str(source_dir), repeat, trace_memory).result())
+    return {
+        'version': BENCH_VERSION,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeat': repeat,
+        'locales': list(locales),
+        'scales': results,
+    }
+
+
+def write_report(report, path):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+        f.write('\n')
@@ -0,0 +1,271 @@
+"""
+Compact binary catalogs for server-side rendering
+
+Layout of <locale>.bin (all integers little-endian u32 unless noted):
+
+    header        magic b'FHCT', version (u16), reserved (u16), namespace,
+                  key and string counts, then the offsets of every section
+    namespace     (namespace count + 1) x (name offset, first key index),
+    table         sorted by name; the last row is a sentinel
+    key table     (key count + 1) x (key offset, string index), sorted by
+                  key within each namespace; the last row is a sentinel
+    string table  (string count + 1) x offset into the string blob
+    name blob     namespace names, UTF-8
+    key blob      keys relative to their namespace ('title' for
+                  'privacy.title'), UTF-8
+    string blob   the deduplicated values, shared across namespaces, UTF-8
+
+Lengths come from the next row's offset, so rows stay 4-8 bytes. Values
+that aren't strings (arrays, numbers, empty objects) are stored as JSON text
+with the top bit of their string index set. The reader memory-maps the file
+and binary-searches the namespace and then the key, so a lookup only touches
+the pages holding that key and its value.
+"""
+import json
+import mmap
+import struct
+from dataclasses import dataclass
+from pathlib import Path
+
+from .bundles import BUNDLES_DIR
+from .catalog import TRANSLATIONS_DIR, load_catalog, locale_path
+from .pool import run_jobs
+
+MAGIC = b'FHCT'
+VERSION = 1
+JSON_VALUE = 0x80000000
+
+_HEADER = struct.Struct('<4sHH9I')
+_PAIR = struct.Struct('<II')
+_OFFSET = struct.Struct('<I')
+
+
+class CatalogFormatError(ValueError):
+    pass
+
+
+def _leaves(data, prefix=''):
+    """Like catalog.flatten, but keeps empty objects so they round-trip."""
+    for key, value in data.items():
+        full_key = f'{prefix}.{key}' if prefix else key
+        if isinstance(value, dict) and value:
+            yield from _leaves(value, full_key)
+        else:
+            yield full_key, value
+
+
+def _split_key(key):
+    namespace, _, rest = key.partition('.')
+    return namespace.encode('utf-8'), rest.encode('utf-8')
+
+
+def encode_catalog(data):
+    """Serialize a nested catalog into the binary format."""
+    pool = {}
+    strings = []
+    entries = []
+    for key, value in _leaves(data):
+        if isinstance(value, str):
+            text, flag = value, 0
+        else:
+            text, flag = json.dumps(value, ensure_ascii=False, separators=(',', ':')), JSON_VALUE
+        if (text, flag) not in pool:
+            pool[text, flag] = len(strings)
+            strings.append(text.encode('utf-8'))
+        entries.append((*_split_key(key), pool[text, flag] | flag))
+    entries.sort(key=lambda entry: (entry[0], entry[1]))
+
+    namespace_table = bytearray()
+    name_blob = bytearray()
+    key_table = bytearray()
+    key_blob = bytearray()
+    current = None
+    for position, (namespace, key, index) in enumerate(entries):
+        if namespace != current:
+            namespace_table += _PAIR.pack(len(name_blob), position)
+            name_blob += namespace
+            current = namespace
+        key_table += _PAIR.pack(len(key_blob), index)
+        key_blob += key
+    namespace_count = len(namespace_table) // _PAIR.size
+    namespace_table += _PAIR.pack(len(name_blob), len(entries))
+    key_table += _PAIR.pack(len(key_blob), 0)
+
+    string_table = bytearray()
+    string_blob = bytearray()
+    for text in strings:
+        string_table += _OFFSET.pack(len(string_blob))
+        string_blob += text
+    string_table += _OFFSET.pack(len(string_blob))
+
+    sections = [namespace_table, key_table, string_table, name_blob, key_blob, string_blob]
+    offsets = []
+    position = _HEADER.size
+    for section in sections:
+        offsets.append(position)
+        position += len(section)
+
+    header = _HEADER.pack(MAGIC, VERSION, 0, namespace_count, len(entries), len(strings), *offsets)
+    return b''.join([header, *sections])
+
+
+class BinaryCatalog:
+    """Lazy, memory-mapped reader for a binary catalog."""
+
+    def __init__(self, path):
+        self._file = open(path, 'rb')
+        try:
+            self._buf = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise CatalogFormatError(f'{path}: empty catalog')
+
+        if len(self._buf) < _HEADER.size:
+            self.close()
+            raise CatalogFormatError(f'{path}: truncated header')
+        (magic, version, _reserved, self.namespace_count, self.key_count, self.string_count,
+         self._namespace_table, self._key_table, self._string_table,
+         self._name_blob, self._key_blob, self._string_blob) = _HEADER.unpack_from(self._buf, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise CatalogFormatError(f'{path}: not a version {VERSION} binary catalog')
+
+    def close(self):
+        self._buf.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return self.key_count
+
+    def _namespace_at(self, position):
+        """(name, first key, end key) of the namespace at `position`."""
+        offset, first = _PAIR.unpack_from(self._buf, self._namespace_table + position * _PAIR.size)
+        end_offset, end = _PAIR.unpack_from(self._buf, self._namespace_table + (position + 1) * _PAIR.size)
+        return self._buf[self._name_blob + offset:self._name_blob + end_offset], first, end
+
+    def _key_at(self, position):
+        offset, index = _PAIR.unpack_from(self._buf, self._key_table + position * _PAIR.size)
+        end_offset, _ = _PAIR.unpack_from(self._buf, self._key_table + (position + 1) * _PAIR.size)
+        return self._buf[self._key_blob + offset:self._key_blob + end_offset], index
+
+    def _value(self, index):
+        row = self._string_table + (index & ~JSON_VALUE) * _OFFSET.size
+        # This row and the next give the string's start and end
+        offset, end = _PAIR.unpack_from(self._buf, row)
+        text = self._buf[self._string_blob + offset:self._string_blob + end].decode('utf-8')
+        return json.loads(text) if index & JSON_VALUE else text
+
+    @staticmethod
+    def _search(high, probe, wanted, low=0):
+        """Binary search rows [low, high) whose first field is sorted."""
+        while low < high:
+            middle = (low + high) // 2
+            candidate = probe(middle)
+            if candidate[0] < wanted:
+                low = middle + 1
+            elif candidate[0] > wanted:
+                high = middle
+            else:
+                return candidate
+        return None
+
+    def _find(self, key):
+        namespace, rest = _split_key(key)
+        found = self._search(self.namespace_count, self._namespace_at, namespace)
+        if found is None:
+            return None
+        _, first, end = found
+        entry = self._search(end, self._key_at, rest, first)
+        return None if entry is None else entry[1]
+
+    def get(self, key, default=None):
+        index = self._find(key)
+        return default if index is None else self._value(index)
+
+    def __contains__(self, key):
+        return self._find(key) is not None
+
+    def __getitem__(self, key):
+        index = self._find(key)
+        if index is None:
+            raise KeyError(key)
+        return self._value(index)
+
+    def items(self):
+        for position in range(self.namespace_count):
+            namespace, first, end = self._namespace_at(position)
+            namespace = namespace.decode('utf-8')
+            for key_position in range(first, end):
+                rest, index = self._key_at(key_position)
+                rest = rest.decode('utf-8')
+                yield (f'{namespace}.{rest}' if rest else namespace), self._value(index)
+
+    def to_dict(self):
+        """Rebuild the nested catalog (key order follows the sorted index)."""
+        data = {}
+        for key, value in self.items():
+            node = data
+            *parents, leaf = key.split('.')
+            for part in parents:
+                node = node.setdefault(part, {})
+            node[leaf] = value
+        return data
+
+
+@dataclass
+class BinaryResult:
+    locale: str
+    path: str
+    keys: int
+    strings: int
+    source_bytes: int
+    bytes: int
+    written: bool
+    verified: bool = None
+
+
+def binary_path(locale, out_dir=BUNDLES_DIR):
+    return Path(out_dir) / f'{locale}.bin'
+
+
+def write_binary_catalog(locale, source, out_dir, verify=False):
+    data = load_catalog(source)
+    encoded = encode_catalog(data)
+    path = binary_path(locale, out_dir)
+
+    try:
+        written = path.read_bytes() != encoded
+    except FileNotFoundError:
+        written = True
+    if written:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(encoded)
+
+    _, _, _, _, keys, strings, *_ = _HEADER.unpack_from(encoded, 0)
+    result = BinaryResult(locale=locale, path=str(path), keys=keys, strings=strings,
+                          source_bytes=Path(source).stat().st_size, bytes=len(encoded), written=written)
+    if verify:
+        result.verified = verify_round_trip(data, path)
+    return result
+
+
+def verify_round_trip(data, path):
+    """Check every key reads back equal to the JSON source, lazily and in bulk."""
+    with BinaryCatalog(path) as catalog:
+        leaves = dict(_leaves(data))
+        if len(catalog) != len(leaves):
+            return False
+        if any(catalog.get(key) != value for key, value in leaves.items()):
+            return False
+        return catalog.to_dict() == data
+
+
+def build_binary_catalogs(locales, directory=TRANSLATIONS_DIR, out_dir=BUNDLES_DIR, workers=None, verify=False):
+    jobs = [(locale, str(locale_path(locale, directory)), str(out_dir), verify) for locale in locales]
+    return run_jobs(write_binary_catalog, jobs, workers)
@@ -0,0 +1,125 @@
+"""
+Split every locale catalog into per-namespace bundles
+
+Each top-level namespace of translations/<locale>.json is written minified to
+<out>/<locale>/<namespace>.json, and <out>/manifest.json lists every chunk
+with its size, so a page can fetch only the namespaces it renders. Locales
+are built in parallel; a locale whose source is unchanged since the last
+build is skipped, and chunks are only rewritten when their bytes change.
+"""
+import gzip
+import json
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from .catalog import ROOT, TRANSLATIONS_DIR, locale_path, parse_catalog
+from .manifest import hash_bytes
+from .pool import run_jobs
+
+BUNDLES_DIR = ROOT / 'public' / 'locales'
+BUNDLE_MANIFEST = 'manifest.json'
+BUNDLE_MANIFEST_VERSION = 1
+
+
+@dataclass
+class BundleResult:
+    locale: str
+    entry: dict
+    skipped: bool = False
+    written: list = field(default_factory=list)
+    removed: list = field(default_factory=list)
+
+
+def minify(value):
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def _write_if_changed(path, data):
+    try:
+        with open(path, 'rb') as f:
+            if f.read() == data:
+                return False
+    except FileNotFoundError:
+        pass
+    with open(path, 'wb') as f:
+        f.write(data)
+    return True
+
+
+def _chunks_exist(out_dir, entry):
+    return all((Path(out_dir) / chunk['file']).is_file() for chunk in entry.get('chunks', {}).values())
+
+
+def bundle_locale(locale, source, out_dir, previous=None, force=False):
+    """Write the namespace chunks for one locale and return its manifest entry."""
+    with open(source, 'rb') as f:
+        raw = f.read()
+    source_hash = hash_bytes(raw)
+
+    if (not force and previous and previous.get('sourceHash') == source_hash
+            and _chunks_exist(out_dir, previous)):
+        return BundleResult(locale=locale, entry=previous, skipped=True)
+
+    locale_dir = Path(out_dir) / locale
+    locale_dir.mkdir(parents=True, exist_ok=True)
+    result = BundleResult(locale=locale, entry={})
+
+    chunks = {}
+    for namespace, value in parse_catalog(raw.decode('utf-8')).items():
+        data = minify(value)
+        file_name = f'{locale}/{namespace}.json'
+        if _write_if_changed(locale_dir / f'{namespace}.json', data):
+            result.written.append(namespace)
+        chunks[namespace] = {
+            'file': file_name,
+            'bytes': len(data),
+            'gzipBytes': len(gzip.compress(data, mtime=0)),
+            'hash': hash_bytes(data)[:12],
+        }
+
+    for stale in sorted(locale_dir.glob('*.json')):
+        if stale.stem not in chunks:
+            stale.unlink()
+            result.removed.append(stale.stem)
+
+    result.entry = {
+        'sourceHash': source_hash,
+        'sourceBytes': len(raw),
+        'bytes': sum(chunk['bytes'] for chunk in chunks.values()),
+        'gzipBytes': sum(chunk['gzipBytes'] for chunk in chunks.values()),
+        'chunks': chunks,
+    }
+    return result
+
+
+def load_bundle_manifest(out_dir):
+    try:
+        with open(Path(out_dir) / BUNDLE_MANIFEST, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+    if data.get('version') != BUNDLE_MANIFEST_VERSION:
+        return {}
+    return data.get('locales', {})
+
+
+def build_bundles(locales, directory=TRANSLATIONS_DIR, out_dir=BUNDLES_DIR, workers=None, force=False):
+    """Build namespace bundles for `locales` and update the bundle manifest."""
+    os.makedirs(out_dir, exist_ok=True)
+    previous = load_bundle_manifest(out_dir)
+    jobs = [
+        (locale, str(locale_path(locale, directory)), str(out_dir), previous.get(locale), force)
+        for locale in locales
+    ]
+    results = run_jobs(bundle_locale, jobs, workers)
+
+    entries = dict(previous)
+    entries.update({result.locale: result.entry for result in results})
+    manifest = {
+        'version': BUNDLE_MANIFEST_VERSION,
+        'locales': {locale: entries[locale] for locale in sorted(entries)},
+    }
+    text = json.dumps(manifest, ensure_ascii=False, indent=2, sort_keys=True) + '\n'
+    _write_if_changed(Path(out_dir) / BUNDLE_MANIFEST, text.encode('utf-8'))
+    return results
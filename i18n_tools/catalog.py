@@ -0,0 +1,59 @@
+"""
+Locating, loading and serializing locale catalogs
+"""
+import json
+import re
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+I18N_DIR = ROOT / 'src' / 'lib' / 'i18n'
+TRANSLATIONS_DIR = I18N_DIR / 'translations'
+
+BASE_LOCALE = 'en'
+
+# Mirrors `locales` in src/lib/i18n/index.ts, used if that file can't be read
+DEFAULT_LOCALES = ['en', 'fr', 'ar', 'hi', 'es', 'zh', 'pt']
+
+_LOCALES_RE = re.compile(r'export\s+const\s+locales\s*:\s*Locale\[\]\s*=\s*\[([^\]]*)\]')
+
+
+def read_locales(index_path=I18N_DIR / 'index.ts'):
+    """Read the supported locales from the frontend's i18n index."""
+    try:
+        source = Path(index_path).read_text(encoding='utf-8')
+    except OSError:
+        return list(DEFAULT_LOCALES)
+
+    match = _LOCALES_RE.search(source)
+    if not match:
+        return list(DEFAULT_LOCALES)
+    return re.findall(r"['\"]([^'\"]+)['\"]", match.group(1))
+
+
+def locale_path(locale, directory=TRANSLATIONS_DIR):
+    return Path(directory) / f'{locale}.json'
+
+
+def parse_catalog(text):
+    return json.loads(text) if text.strip() else {}
+
+
+def load_catalog(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return parse_catalog(f.read())
+
+
+def dump_catalog(data, trailing_newline=False):
+    """Serialize a catalog the way the translation files are stored."""
+    text = json.dumps(data, ensure_ascii=False, indent=2)
+    return text + '\n' if trailing_newline else text
+
+
+def flatten(data, prefix=''):
+    """Yield (dotted key, value) for every leaf in document order."""
+    for key, value in data.items():
+        full_key = f'{prefix}.{key}' if prefix else key
+        if isinstance(value, dict):
+            yield from flatten(value, full_key)
+        else:
+            yield full_key, value
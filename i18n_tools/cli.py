@@ -0,0 +1,328 @@
+"""
+Command line entry point for the translation tooling
+"""
+import argparse
+import json
+from collections import Counter
+import sys
+import time
+
+from .bench import DEFAULT_REPEAT, DEFAULT_SCALES, run_benchmarks, write_report
+from .binary import build_binary_catalogs
+from .bundles import BUNDLES_DIR, build_bundles
+from .catalog import BASE_LOCALE, TRANSLATIONS_DIR, load_catalog, locale_path, read_locales
+from .flat import benchmark_lookups, build_flat_table, build_flat_tables
+from .manifest import MANIFEST_PATH, Manifest
+from .merge import check_locales, combine_patches, load_patch_file, merge_all
+from .profiling import profiled
+from .tm import DEFAULT_THRESHOLD, TM_PATH, TranslationMemory, fill_namespaces
+from .validate import validate_all
+from .watch import DEFAULT_DEBOUNCE, DEFAULT_POLL_INTERVAL, WatchSession, watch
+
+
+def _add_common_arguments(parser):
+    parser.add_argument('--dir', default=str(TRANSLATIONS_DIR), help='translations directory')
+    parser.add_argument('--locales', nargs='+', help='only process these locales')
+    parser.add_argument('--profile', metavar='FILE', help='run under cProfile and write the stats here')
+    parser.add_argument('--trace-memory', action='store_true', help='report tracemalloc peak and top allocations')
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description='Locale catalog tooling for Fruit Habibi')
+    commands = parser.add_subparsers(dest='command')
+
+    merge = commands.add_parser('merge', help='apply namespace patches to the locale catalogs')
+    _add_common_arguments(merge)
+    merge.add_argument('--patch', action='append', default=[], metavar='FILE',
+                       help='JSON patch source shaped {namespace: {locale: values}}; repeatable')
+    merge.add_argument('--workers', type=int, help='worker processes (default: CPU count)')
+    merge.add_argument('--incremental', action='store_true',
+                       help='skip locales whose patches and file are unchanged since the last run')
+    merge.add_argument('--streaming', action='store_true',
+                       help='splice patched values into the files instead of re-serializing them')
+    merge.add_argument('--timings', action='store_true', help='print per-stage timings for every locale')
+    merge.add_argument('--manifest', default=str(MANIFEST_PATH), help='manifest used by --incremental')
+    merge.set_defaults(handler=run_merge)
+
+    validate = commands.add_parser('validate', help='check every locale against the base locale')
+    _add_common_arguments(validate)
+    validate.add_argument('--strict', action='store_true',
+                          help='also fail on extra keys and placeholder markers')
+    validate.add_argument('--output', metavar='FILE', help='write the JSON report here instead of stdout')
+    validate.set_defaults(handler=run_validate)
+
+    bundle = commands.add_parser('bundle', help='split each locale into per-namespace chunks')
+    _add_common_arguments(bundle)
+    bundle.add_argument('--out', default=str(BUNDLES_DIR), help='output directory for the chunks')
+    bundle.add_argument('--workers', type=int, help='worker processes (default: CPU count)')
+    bundle.add_argument('--force', action='store_true', help='rebuild locales even if their source is unchanged')
+    bundle.add_argument('--chunks', action='store_true', help='print the size of every chunk')
+    bundle.set_defaults(handler=run_bundle)
+
+    flat = commands.add_parser('flat', help='emit precompiled flat key -> string tables')
+    _add_common_arguments(flat)
+    flat.add_argument('--out', default=str(BUNDLES_DIR), help='output directory for <locale>.flat.json')
+    flat.add_argument('--workers', type=int, help='worker processes (default: CPU count)')
+    flat.add_argument('--bench', action='store_true', help='compare nested-walk and flat-table lookups')
+    flat.set_defaults(handler=run_flat)
+
+    tm = commands.add_parser('tm', help='translation memory: index existing pairs and pre-fill namespaces')
+    tm_commands = tm.add_subparsers(dest='tm_command', required=True)
+
+    tm_build = tm_commands.add_parser('build', help='index every en -> locale pair')
+    _add_common_arguments(tm_build)
+    tm_build.add_argument('--store', default=str(TM_PATH), help='translation memory file')
+    tm_build.add_argument('--force', action='store_true', help='rebuild even if no catalog changed')
+    tm_build.set_defaults(handler=run_tm_build)
+
+    tm_fill = tm_commands.add_parser('fill', help='propose translations for missing or placeholder keys')
+    _add_common_arguments(tm_fill)
+    tm_fill.add_argument('--store', default=str(TM_PATH), help='translation memory file')
+    tm_fill.add_argument('--namespace', action='append', required=True, dest='namespaces',
+                         help='en.json namespace to fill; repeatable')
+    tm_fill.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                         help='minimum similarity for fuzzy matches (default: %(default)s)')
+    tm_fill.add_argument('--accept-fuzzy', action='store_true', help='put fuzzy matches in the patch too')
+    tm_fill.add_argument('--placeholders', action='store_true',
+                         help='fill unmatched missing keys with an [XX] English placeholder')
+    tm_fill.add_argument('--out', metavar='FILE', help='write the patch here (usable with merge --patch)')
+    tm_fill.add_argument('--report', metavar='FILE', help='write every proposal with its score here')
+    tm_fill.add_argument('--apply', action='store_true', help='merge the patch into the catalogs right away')
+    tm_fill.set_defaults(handler=run_tm_fill)
+
+    watch = commands.add_parser('watch', help='re-merge and re-validate changed keys on every save')
+    _add_common_arguments(watch)
+    watch.add_argument('--patch', action='append', default=[], metavar='FILE',
+                       help='JSON patch source to watch; repeatable')
+    watch.add_argument('--debounce', type=float, default=DEFAULT_DEBOUNCE * 1000,
+                       help='ms to wait for a burst of saves to settle (default: %(default)s)')
+    watch.add_argument('--poll', action='store_true', help='poll file stats instead of using inotify')
+    watch.add_argument('--interval', type=float, default=DEFAULT_POLL_INTERVAL * 1000,
+                       help='polling interval in ms (default: %(default)s)')
+    watch.set_defaults(handler=run_watch)
+
+    binary = commands.add_parser('binary', help='emit compact memory-mappable binary catalogs')
+    _add_common_arguments(binary)
+    binary.add_argument('--out', default=str(BUNDLES_DIR), help='output directory for <locale>.bin')
+    binary.add_argument('--workers', type=int, help='worker processes (default: CPU count)')
+    binary.add_argument('--verify', action='store_true',
+                        help='read every catalog back and compare it with its JSON source')
+    binary.set_defaults(handler=run_binary)
+
+    bench = commands.add_parser('bench', help='time the pipeline stages on synthetic catalogs')
+    _add_common_arguments(bench)
+    bench.add_argument('--scales', nargs='+', type=int, default=list(DEFAULT_SCALES),
+                       help='multiples of the real catalog size (default: %(default)s)')
+    bench.add_argument('--repeat', type=int, default=DEFAULT_REPEAT,
+                       help='runs per scale; the fastest is kept (default: %(default)s)')
+    bench.add_argument('--output', metavar='FILE', help='write the JSON report here')
+    bench.set_defaults(handler=run_bench)
+
+    return parser
+
+
+def run_merge(args, builtin_patches):
+    patches = combine_patches(builtin_patches, *(load_patch_file(path) for path in args.patch))
+    check_locales(patches, read_locales())
+
+    manifest = Manifest.load(args.manifest) if args.incremental else None
+
+    start = time.perf_counter()
+    results = merge_all(patches, directory=args.dir, locales=args.locales, workers=args.workers,
+                        manifest=manifest, streaming=args.streaming)
+    elapsed = time.perf_counter() - start
+
+    if manifest is not None:
+        manifest.save()
+
+    for result in results:
+        namespaces = ', '.join(result.namespaces)
+        if result.changed:
+            print(f'{result.locale.upper()} {namespaces} translations updated!')
+        elif result.skipped == 'manifest':
+            print(f'{result.locale.upper()} {namespaces} skipped (unchanged since last run)')
+        else:
+            print(f'{result.locale.upper()} {namespaces} already up to date')
+
+    if args.timings:
+        for result in results:
+            stages = ', '.join(f'{name} {ms:.2f} ms' for name, ms in result.timings.items())
+            print(f'  {result.locale.upper()}: {stages}')
+
+    written = sum(1 for result in results if result.changed)
+    print(f'Merged {len(results)} locale file(s) in {elapsed * 1000:.1f} ms, '
+          f'{written} written, {len(results) - written} skipped')
+    return 0
+
+
+def run_validate(args, builtin_patches):
+    report = validate_all(args.locales or read_locales(), directory=args.dir, strict=args.strict)
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+        for locale, result in report['locales'].items():
+            status = 'OK' if result['isValid'] else 'FAIL'
+            print(f"{locale.upper()}: {status} - {len(result['missingKeys'])} missing, "
+                  f"{len(result['extraKeys'])} extra, {len(result['typeMismatches'])} type mismatch(es), "
+                  f"{len(result['placeholders'])} placeholder(s)")
+        print(f"Validated {len(report['locales'])} locale(s) in {report['elapsedMs']} ms")
+    else:
+        print(text)
+
+    return 0 if report['isValid'] else 1
+
+
+def run_bundle(args, builtin_patches):
+    start = time.perf_counter()
+    results = build_bundles(args.locales or read_locales(), directory=args.dir, out_dir=args.out,
+                            workers=args.workers, force=args.force)
+    elapsed = time.perf_counter() - start
+
+    for result in results:
+        entry = result.entry
+        if result.skipped:
+            status = 'unchanged'
+        else:
+            status = f'{len(result.written)} chunk(s) written'
+            if result.removed:
+                status += f', {len(result.removed)} removed'
+        print(f"{result.locale.upper()}: {len(entry['chunks'])} chunks, {entry['sourceBytes']} B source -> "
+              f"{entry['bytes']} B minified ({entry['gzipBytes']} B gzip), {status}")
+        if args.chunks:
+            for namespace, chunk in sorted(entry['chunks'].items(), key=lambda item: -item[1]['bytes']):
+                print(f"    {namespace:<20} {chunk['bytes']:>8} B {chunk['gzipBytes']:>8} B gzip")
+    print(f'Bundled {len(results)} locale(s) in {elapsed * 1000:.1f} ms')
+    return 0
+
+
+def run_flat(args, builtin_patches):
+    locales = args.locales or read_locales()
+    start = time.perf_counter()
+    results = build_flat_tables(locales, directory=args.dir, out_dir=args.out, workers=args.workers)
+    elapsed = time.perf_counter() - start
+
+    for result in results:
+        status = 'written' if result.written else 'unchanged'
+        print(f'{result.locale.upper()}: {result.keys} keys, {result.strings} unique strings, '
+              f'{result.templates} templates, {result.bytes} B, {status}')
+    print(f'Built {len(results)} flat table(s) in {elapsed * 1000:.1f} ms')
+
+    if args.bench:
+        print('\nLookup benchmark (ns per lookup over every key):')
+        for locale in locales:
+            data = load_catalog(locale_path(locale, args.dir))
+            stats = benchmark_lookups(data, build_flat_table(data, locale))
+            print(f"{locale.upper()}: nested {stats['nestedNs']} ns, flat {stats['flatNs']} ns, "
+                  f"{stats['speedup']}x over {stats['keys']} keys")
+    return 0
+
+
+def _load_memory(args, locales):
+    memory = TranslationMemory.load(args.store)
+    if getattr(args, 'force', False) or not memory.is_current(sorted(set(locales) | {BASE_LOCALE}), args.dir):
+        memory.build(locales, directory=args.dir)
+        memory.save()
+    return memory
+
+
+def run_tm_build(args, builtin_patches):
+    start = time.perf_counter()
+    memory = _load_memory(args, args.locales or read_locales())
+    elapsed = time.perf_counter() - start
+
+    pairs = sum(len(targets) for targets in memory.entries.values())
+    print(f'Translation memory: {len(memory.entries)} sources, {pairs} pairs ({elapsed * 1000:.1f} ms)')
+    return 0
+
+
+def run_tm_fill(args, builtin_patches):
+    locales = args.locales or read_locales()
+    start = time.perf_counter()
+    memory = _load_memory(args, locales)
+    patch, report = fill_namespaces(memory, args.namespaces, locales, directory=args.dir,
+                                    threshold=args.threshold, accept_fuzzy=args.accept_fuzzy,
+                                    placeholders=args.placeholders)
+    elapsed = time.perf_counter() - start
+
+    counts = Counter((item['locale'], item['status']) for item in report)
+    for locale in locales:
+        if locale == BASE_LOCALE:
+            continue
+        print(f"{locale.upper()}: {counts[locale, 'exact']} exact, {counts[locale, 'fuzzy']} fuzzy, "
+              f"{counts[locale, 'missing']} without match")
+    print(f'Looked up {len(report)} key(s) in {elapsed * 1000:.1f} ms')
+
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump(patch, f, ensure_ascii=False, indent=2)
+    if args.apply and patch:
+        results = merge_all(patch, directory=args.dir)
+        print(f'Applied to {sum(1 for result in results if result.changed)} locale file(s)')
+    return 0
+
+
+def run_watch(args, builtin_patches):
+    locales = args.locales or read_locales()
+    check_locales(combine_patches(builtin_patches, *(load_patch_file(path) for path in args.patch)),
+                  read_locales())
+    session = WatchSession(locales, directory=args.dir, patch_paths=args.patch, builtin_patches=builtin_patches)
+    watch(session, debounce=args.debounce / 1000, polling=args.poll, interval=args.interval / 1000)
+    return 0
+
+
+def run_binary(args, builtin_patches):
+    start = time.perf_counter()
+    results = build_binary_catalogs(args.locales or read_locales(), directory=args.dir, out_dir=args.out,
+                                    workers=args.workers, verify=args.verify)
+    elapsed = time.perf_counter() - start
+
+    for result in results:
+        status = 'written' if result.written else 'unchanged'
+        if result.verified is not None:
+            status += ', round-trip OK' if result.verified else ', ROUND-TRIP MISMATCH'
+        print(f'{result.locale.upper()}: {result.keys} keys, {result.strings} unique strings, '
+              f'{result.source_bytes} B JSON -> {result.bytes} B, {status}')
+    print(f'Built {len(results)} binary catalog(s) in {elapsed * 1000:.1f} ms')
+    return 0 if all(result.verified is not False for result in results) else 1
+
+
+def run_bench(args, builtin_patches):
+    report = run_benchmarks(args.locales or read_locales(), scales=args.scales, source_dir=args.dir,
+                            repeat=args.repeat, trace_memory=args.trace_memory)
+
+    for result in report['scales']:
+        stages = ', '.join(f'{name} {ms:.1f}' for name, ms in result['stagesMs'].items())
+        rss = result['peakRssBytes']
+        rss_text = f'{rss / (1 << 20):.1f} MiB' if rss is not None else 'n/a'
+        source = sum(locale['sourceBytes'] for locale in result['locales'].values())
+        written = sum(locale['bytesWritten'] for locale in result['locales'].values())
+        streamed = sum(locale['streamingBytesWritten'] for locale in result['locales'].values())
+        print(f"{result['scale']}x ({result['baseKeys']} keys, {source / (1 << 20):.1f} MiB): {stages} ms; "
+              f'peak RSS {rss_text}; written {written} B, streaming {streamed} B')
+
+    if args.output:
+        write_report(report, args.output)
+        print(f'Report written to {args.output}')
+    return 0
+
+
+def main(argv=None, builtin_patches=None):
+    parser = build_parser()
+    argv = list(sys.argv[1:] if argv is None else argv)
+    # Plain `fill_privacy_translations.py [merge options]` keeps working
+    if not argv or (argv[0].startswith('-') and argv[0] not in ('-h', '--help')):
+        argv = ['merge', *argv]
+
+    args = parser.parse_args(argv)
+
+    try:
+        with profiled(args.profile, args.trace_memory and args.command != 'bench'):
+            return args.handler(args, builtin_patches or {})
+    except (OSError, ValueError) as error:
+        print(f'error: {error}', file=sys.stderr)
+        return 1
@@ -0,0 +1,141 @@
+"""
+Precompiled flat lookup tables for the runtime t() path
+
+For each locale this writes <out>/<locale>.flat.json:
+
+    {
+      "locale": "fr",
+      "strings": ["Parcourir les annonces", ...],
+      "keys": {"common.browseListings": 0, ...},
+      "templates": {"42": ["Seulement ", "quantity", " unités disponibles"]}
+    }
+
+`strings` is the locale's deduplicated string pool and `keys` maps every
+dotted key straight to an index in it, so a lookup is one hash probe instead
+of splitting the key and walking the nested catalog. Strings containing
+{placeholders} are pre-split in `templates`: even entries are literal text,
+odd entries are variable names.
+"""
+import json
+import re
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+from .bundles import BUNDLES_DIR
+from .catalog import TRANSLATIONS_DIR, flatten, load_catalog, locale_path
+from .pool import run_jobs
+
+_PLACEHOLDER = re.compile(r'\{(\w+)\}')
+
+
+@dataclass
+class FlatResult:
+    locale: str
+    path: str
+    keys: int
+    strings: int
+    templates: int
+    bytes: int
+    written: bool
+
+
+def parse_template(value):
+    """Split 'Only {quantity} left' into ['Only ', 'quantity', ' left'], or None."""
+    parts = _PLACEHOLDER.split(value)
+    return parts if len(parts) > 1 else None
+
+
+def build_flat_table(data, locale):
+    strings = []
+    index = {}
+    keys = {}
+    templates = {}
+
+    for key, value in flatten(data):
+        if not isinstance(value, str):
+            continue
+        value = sys.intern(value)
+        position = index.get(value)
+        if position is None:
+            position = index[value] = len(strings)
+            strings.append(value)
+            template = parse_template(value)
+            if template:
+                templates[str(position)] = template
+        keys[key] = position
+
+    return {'locale': locale, 'strings': strings, 'keys': keys, 'templates': templates}
+
+
+def flat_path(locale, out_dir=BUNDLES_DIR):
+    return Path(out_dir) / f'{locale}.flat.json'
+
+
+def write_flat_table(locale, source, out_dir):
+    table = build_flat_table(load_catalog(source), locale)
+    data = json.dumps(table, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    path = flat_path(locale, out_dir)
+
+    try:
+        written = path.read_bytes() != data
+    except FileNotFoundError:
+        written = True
+    if written:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+
+    return FlatResult(
+        locale=locale,
+        path=str(path),
+        keys=len(table['keys']),
+        strings=len(table['strings']),
+        templates=len(table['templates']),
+        bytes=len(data),
+        written=written,
+    )
+
+
+def build_flat_tables(locales, directory=TRANSLATIONS_DIR, out_dir=BUNDLES_DIR, workers=None):
+    jobs = [(locale, str(locale_path(locale, directory)), str(out_dir)) for locale in locales]
+    return run_jobs(write_flat_table, jobs, workers)
+
+
+def nested_lookup(translations, key):
+    """Same walk as t() in src/contexts/I18nContext.tsx."""
+    value = translations
+    for part in key.split('.'):
+        if isinstance(value, dict) and part in value:
+            value = value[part]
+        else:
+            return key
+    return value if isinstance(value, str) else key
+
+
+def flat_lookup(table, key):
+    position = table['keys'].get(key)
+    return key if position is None else table['strings'][position]
+
+
+def benchmark_lookups(data, table, rounds=200):
+    """Time every key through both lookups; returns nanoseconds per lookup."""
+    keys = list(table['keys'])
+    for key in keys:
+        if nested_lookup(data, key) != flat_lookup(table, key):
+            raise AssertionError(f'flat table disagrees with catalog for {key!r}')
+
+    def measure(lookup, source):
+        best = float('inf')
+        for _ in range(5):
+            start = time.perf_counter_ns()
+            for _ in range(rounds):
+                for key in keys:
+                    lookup(source, key)
+            best = min(best, time.perf_counter_ns() - start)
+        return best / (rounds * len(keys))
+
+    nested = measure(nested_lookup, data)
+    flat = measure(flat_lookup, table)
+    return {'keys': len(keys), 'nestedNs': round(nested, 1), 'flatNs': round(flat, 1),
+            'speedup': round(nested / flat, 2)}
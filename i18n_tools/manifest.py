@@ -0,0 +1,78 @@
+"""
+On-disk manifest of content hashes for incremental merges
+
+For every locale the manifest records the hash of each namespace patch that
+was applied and the hash of the catalog file that resulted. A locale whose
+patches and file both still match can be skipped without parsing it.
+"""
+import hashlib
+import json
+import os
+
+from .catalog import ROOT
+
+CACHE_DIR = ROOT / '.i18n-cache'
+MANIFEST_PATH = CACHE_DIR / 'merge-manifest.json'
+MANIFEST_VERSION = 1
+
+
+def hash_bytes(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_value(value):
+    """Hash a JSON value independently of key order and formatting."""
+    canonical = json.dumps(value, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    return hash_bytes(canonical.encode('utf-8'))
+
+
+def hash_file(path, chunk_size=1 << 20):
+    """Hash a file in fixed-size chunks so large catalogs aren't read whole."""
+    digest = hashlib.sha256()
+    try:
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(chunk_size), b''):
+                digest.update(chunk)
+    except FileNotFoundError:
+        return hash_bytes(b'')
+    return digest.hexdigest()
+
+
+class Manifest:
+    def __init__(self, path=MANIFEST_PATH, entries=None):
+        self.path = path
+        self.entries = entries or {}
+
+    @classmethod
+    def load(cls, path=MANIFEST_PATH):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return cls(path)
+        if data.get('version') != MANIFEST_VERSION:
+            return cls(path)
+        return cls(path, data.get('locales', {}))
+
+    def get(self, locale):
+        return self.entries.get(locale)
+
+    def update(self, locale, file_hash, namespace_hashes):
+        entry = self.entries.setdefault(locale, {'namespaces': {}})
+        entry['file'] = file_hash
+        entry['namespaces'].update(namespace_hashes)
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f'{self.path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': MANIFEST_VERSION, 'locales': self.entries}, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+
+def is_current(entry, file_hash, namespace_hashes):
+    """True if the catalog and every patch still match what was last merged."""
+    if not entry or entry.get('file') != file_hash:
+        return False
+    known = entry.get('namespaces', {})
+    return all(known.get(namespace) == digest for namespace, digest in namespace_hashes.items())
@@ -0,0 +1,194 @@
+"""
+Apply namespace patches to every locale catalog
+
+Patches are keyed namespace -> locale -> values, e.g.
+{'privacy': {'fr': {'title': '...'}}}. They are regrouped per locale so that
+each catalog is read and written exactly once however many namespaces are
+patched, and locales are processed in parallel.
+"""
+import json
+from dataclasses import dataclass, field
+
+from .catalog import TRANSLATIONS_DIR, dump_catalog, locale_path, parse_catalog
+from .manifest import hash_bytes, hash_file, hash_value, is_current
+from .pool import run_jobs
+from .profiling import StageTimer
+from .stream import patch_file
+
+
+@dataclass
+class MergeResult:
+    locale: str
+    path: str
+    namespaces: list = field(default_factory=list)
+    changed: bool = False
+    skipped: str = None  # 'manifest' or 'unchanged' when the file was left alone
+    bytes_written: int = 0
+    file_hash: str = None
+    namespace_hashes: dict = field(default_factory=dict)
+    timings: dict = field(default_factory=dict)  # stage -> ms
+
+
+def load_patch_file(path):
+    """Load a JSON patch source shaped {namespace: {locale: values}}."""
+    with open(path, 'r', encoding='utf-8') as f:
+        patches = json.load(f)
+    if not isinstance(patches, dict):
+        raise ValueError(f'{path}: patch source must be a JSON object')
+    return patches
+
+
+def combine_patches(*sources):
+    """Combine patch sources; later sources win for the same key."""
+    combined = {}
+    for patches in sources:
+        for namespace, by_locale in patches.items():
+            for locale, values in by_locale.items():
+                target = combined.setdefault(namespace, {}).setdefault(locale, {})
+                deep_merge(target, values)
+    return combined
+
+
+def add_to_patch(patch, namespace, locale, key, value):
+    """Set dotted `key` (relative to `namespace`) for `locale` in `patch`."""
+    node = patch.setdefault(namespace, {}).setdefault(locale, {})
+    *parents, leaf = key.split('.')
+    for part in parents:
+        node = node.setdefault(part, {})
+    node[leaf] = value
+
+
+def check_locales(patches, supported):
+    """Raise if a patch targets a locale the frontend doesn't ship."""
+    unknown = sorted({locale for by_locale in patches.values() for locale in by_locale} - set(supported))
+    if unknown:
+        raise ValueError(f'Unknown locale(s) in patches: {", ".join(unknown)}')
+
+
+def group_by_locale(patches, locales=None):
+    """Regroup namespace -> locale patches into locale -> namespace."""
+    grouped = {}
+    for namespace, by_locale in patches.items():
+        for locale, values in by_locale.items():
+            if locales is not None and locale not in locales:
+                continue
+            grouped.setdefault(locale, {})[namespace] = values
+    return grouped
+
+
+def deep_merge(target, values):
+    """Merge `values` into `target` in place, recursing into nested objects."""
+    for key, value in values.items():
+        if isinstance(value, dict) and isinstance(target.get(key), dict):
+            deep_merge(target[key], value)
+        elif isinstance(value, dict):
+            target[key] = deep_merge({}, value)
+        else:
+            target[key] = value
+    return target
+
+
+def apply_namespaces(data, namespaces):
+    for namespace, values in namespaces.items():
+        if not isinstance(data.get(namespace), dict):
+            data[namespace] = {}
+        deep_merge(data[namespace], values)
+    return data
+
+
+def merge_locale(locale, path, namespaces, entry=None, streaming=False):
+    """Read one catalog, apply all of its namespace patches and write it back.
+
+    The file is only rewritten when the merged result differs from what is on
+    disk. With a manifest `entry`, a catalog whose bytes and patches are
+    unchanged since the last run is skipped without being parsed. `streaming`
+    splices the patched values into the file instead of re-serializing it.
+    """
+    result = MergeResult(
+        locale=locale,
+        path=str(path),
+        namespaces=sorted(namespaces),
+        namespace_hashes={namespace: hash_value(values) for namespace, values in namespaces.items()},
+    )
+    timer = StageTimer()
+    try:
+        if streaming:
+            return _merge_streaming(result, path, namespaces, entry, timer)
+        return _merge_parsed(result, path, namespaces, entry, timer)
+    finally:
+        result.timings = timer.as_dict()
+
+
+def _merge_parsed(result, path, namespaces, entry, timer):
+    with timer.stage('load'):
+        try:
+            with open(path, 'rb') as f:
+                raw = f.read()
+        except FileNotFoundError:
+            raw = b''
+        result.file_hash = hash_bytes(raw)
+
+    if entry is not None and is_current(entry, result.file_hash, result.namespace_hashes):
+        result.skipped = 'manifest'
+        return result
+
+    with timer.stage('parse'):
+        original = raw.decode('utf-8')
+        data = parse_catalog(original)
+    with timer.stage('merge'):
+        apply_namespaces(data, namespaces)
+    with timer.stage('serialize'):
+        text = dump_catalog(data, trailing_newline=original.endswith('\n'))
+    if text == original:
+        result.skipped = 'unchanged'
+        return result
+
+    with timer.stage('write'):
+        encoded = text.encode('utf-8')
+        with open(path, 'wb') as f:
+            f.write(encoded)
+
+    result.changed = True
+    result.bytes_written = len(encoded)
+    result.file_hash = hash_bytes(encoded)
+    return result
+
+
+def _merge_streaming(result, path, namespaces, entry, timer):
+    with timer.stage('load'):
+        result.file_hash = hash_file(path)
+    if entry is not None and is_current(entry, result.file_hash, result.namespace_hashes):
+        result.skipped = 'manifest'
+        return result
+
+    with timer.stage('patch'):
+        written = patch_file(path, namespaces)
+    if not written:
+        result.skipped = 'unchanged'
+        return result
+
+    result.changed = True
+    result.bytes_written = written
+    result.file_hash = hash_file(path)
+    return result
+
+
+def merge_all(patches, directory=TRANSLATIONS_DIR, locales=None, workers=None, manifest=None,
+              streaming=False):
+    """Apply `patches` to every affected locale catalog under `directory`.
+
+    If a `manifest` is given it is consulted to skip unchanged locales and
+    updated with the new hashes; saving it is left to the caller.
+    """
+    grouped = group_by_locale(patches, locales)
+    jobs = [
+        (locale, str(locale_path(locale, directory)), grouped[locale],
+         manifest.get(locale) if manifest is not None else None, streaming)
+        for locale in sorted(grouped)
+    ]
+    results = run_jobs(merge_locale, jobs, workers)
+
+    if manifest is not None:
+        for result in results:
+            manifest.update(result.locale, result.file_hash, result.namespace_hashes)
+    return results
@@ -0,0 +1,20 @@
+"""
+Run per-locale jobs in a process pool
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+
+def run_jobs(func, jobs, workers=None):
+    """Call `func(*job)` for every job, in parallel when it's worth it.
+
+    Results come back in job order.
+    """
+    jobs = list(jobs)
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(jobs) <= 1:
+        return [func(*job) for job in jobs]
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+        futures = [pool.submit(func, *job) for job in jobs]
+        return [future.result() for future in futures]
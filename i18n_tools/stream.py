@@ -0,0 +1,184 @@
+"""
+Streaming, order-preserving patches for large catalogs
+
+Instead of loading a catalog into a dict and re-serializing all of it, the
+file is memory-mapped and scanned for the key paths a patch touches. Only
+those values are replaced (or new keys inserted next to their siblings);
+every other byte is copied through unchanged, so memory stays bounded by the
+patch size and diffs contain only the patched lines.
+
+Patch semantics match merge.deep_merge: nested objects are merged key by key,
+anything else replaces the existing value.
+"""
+import json
+import mmap
+import os
+import re
+
+from .catalog import dump_catalog
+
+_WHITESPACE = re.compile(rb'[ \t\r\n]*')
+# Unrolled form; far faster than (?:[^"\\]|\\.)* on long strings
+_STRING = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"', re.DOTALL)
+_SCALAR = re.compile(rb'-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][+-]?\d+)?|true|false|null')
+# Strings are matched whole so brackets inside them are never counted
+_CONTAINER_TOKEN = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"|[{}\[\]]', re.DOTALL)
+
+INDENT = '  '
+COPY_CHUNK = 1 << 20
+
+
+class PatchError(ValueError):
+    pass
+
+
+def _skip_ws(buf, pos):
+    return _WHITESPACE.match(buf, pos).end()
+
+
+def _expect(buf, pos, char):
+    if buf[pos:pos + 1] != char:
+        raise PatchError(f'expected {char.decode()!r} at byte {pos}')
+    return pos + 1
+
+
+def _skip_value(buf, pos):
+    """Return the offset just past the JSON value starting at `pos`."""
+    first = buf[pos:pos + 1]
+    if first == b'"':
+        match = _STRING.match(buf, pos)
+        if not match:
+            raise PatchError(f'unterminated string at byte {pos}')
+        return match.end()
+    if first in (b'{', b'['):
+        depth = 0
+        for match in _CONTAINER_TOKEN.finditer(buf, pos):
+            token = match.group()
+            if token in (b'{', b'['):
+                depth += 1
+            elif token in (b'}', b']'):
+                depth -= 1
+                if depth == 0:
+                    return match.end()
+        raise PatchError(f'unterminated container at byte {pos}')
+    match = _SCALAR.match(buf, pos)
+    if not match:
+        raise PatchError(f'unexpected value at byte {pos}')
+    return match.end()
+
+
+def _line_indent(buf, pos):
+    """Indentation of the line containing `pos`."""
+    line_start = buf.rfind(b'\n', 0, pos) + 1
+    match = _WHITESPACE.match(buf, line_start)
+    return buf[line_start:min(match.end(), pos)].decode('utf-8')
+
+
+def serialize_value(value, indent):
+    """Serialize `value` as it would appear nested at `indent` in the catalog."""
+    text = json.dumps(value, ensure_ascii=False, indent=2)
+    return text.replace('\n', '\n' + indent)
+
+
+def _member(key, value, indent):
+    return f'{indent}{json.dumps(key, ensure_ascii=False)}: {serialize_value(value, indent)}'
+
+
+def _collect_object(buf, pos, patch, splices):
+    """Scan the object at `pos`, recording splices for `patch`; return its end."""
+    open_pos = pos
+    pos = _skip_ws(buf, _expect(buf, pos, b'{'))
+    remaining = set(patch)
+    member_indent = None
+    last_value_end = None
+
+    while buf[pos:pos + 1] != b'}':
+        if last_value_end is not None:
+            pos = _skip_ws(buf, _expect(buf, pos, b','))
+        key_match = _STRING.match(buf, pos)
+        if not key_match:
+            raise PatchError(f'expected object key at byte {pos}')
+        if member_indent is None:
+            member_indent = _line_indent(buf, pos)
+        raw_key = key_match.group()
+        key = json.loads(raw_key) if b'\\' in raw_key else raw_key[1:-1].decode('utf-8')
+        pos = _skip_ws(buf, _expect(buf, _skip_ws(buf, key_match.end()), b':'))
+
+        value_start = pos
+        if key in patch:
+            # Duplicate keys are all patched, since parsers keep the last one
+            remaining.discard(key)
+            value = patch[key]
+            if isinstance(value, dict) and buf[pos:pos + 1] == b'{':
+                value_end = _collect_object(buf, pos, value, splices)
+            else:
+                value_end = _skip_value(buf, pos)
+                splices.append((value_start, value_end, serialize_value(value, member_indent).encode('utf-8')))
+        else:
+            value_end = _skip_value(buf, pos)
+
+        last_value_end = value_end
+        pos = _skip_ws(buf, value_end)
+
+    close_pos = pos
+    if remaining:
+        if last_value_end is None:
+            # Empty object: open it up onto its own lines
+            outer_indent = _line_indent(buf, open_pos)
+            inner_indent = outer_indent + INDENT
+            members = ',\n'.join(_member(key, value, inner_indent) for key, value in patch.items()
+                                 if key in remaining)
+            splices.append((open_pos + 1, close_pos, f'\n{members}\n{outer_indent}'.encode('utf-8')))
+        else:
+            members = ''.join(f',\n{_member(key, value, member_indent)}' for key, value in patch.items()
+                              if key in remaining)
+            splices.append((last_value_end, last_value_end, members.encode('utf-8')))
+
+    return close_pos + 1
+
+
+def plan_splices(buf, patch):
+    """Return sorted (start, end, replacement) splices applying `patch` to `buf`."""
+    pos = _skip_ws(buf, 0)
+    splices = []
+    _collect_object(buf, pos, patch, splices)
+    splices.sort(key=lambda splice: splice[0])
+    return splices
+
+
+def _write_spliced(buf, splices, out):
+    written = 0
+    pos = 0
+    for start, end, replacement in splices:
+        for chunk_start in range(pos, start, COPY_CHUNK):
+            written += out.write(buf[chunk_start:min(chunk_start + COPY_CHUNK, start)])
+        written += out.write(replacement)
+        pos = end
+    for chunk_start in range(pos, len(buf), COPY_CHUNK):
+        written += out.write(buf[chunk_start:min(chunk_start + COPY_CHUNK, len(buf))])
+    return written
+
+
+def patch_file(path, patch):
+    """Apply `patch` to the catalog at `path` in place.
+
+    Returns the number of bytes written, or 0 if the file already matched.
+    """
+    size = os.path.getsize(path) if os.path.exists(path) else 0
+    if size == 0:
+        # Nothing to stream from; write a fresh catalog
+        encoded = dump_catalog(patch, trailing_newline=True).encode('utf-8')
+        with open(path, 'wb') as f:
+            f.write(encoded)
+        return len(encoded)
+
+    tmp_path = f'{path}.tmp'
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+        splices = [splice for splice in plan_splices(buf, patch) if buf[splice[0]:splice[1]] != splice[2]]
+        if not splices:
+            return 0
+        with open(tmp_path, 'wb') as out:
+            written = _write_spliced(buf, splices, out)
+
+    os.replace(tmp_path, path)
+    return written
@@ -0,0 +1,246 @@
+"""
+Translation memory for bulk-filling namespaces
+
+Every (en source -> target) pair found in the locale catalogs is indexed in an
+on-disk store. Lookups are exact first; otherwise MinHash signatures over
+character trigrams, bucketed with locality-sensitive hashing, narrow the
+memory down to a few candidates which are scored by their true Jaccard
+similarity. Hot lookups are cached in an LRU.
+
+Pairs whose target still carries the `[XX]` placeholder marker are not
+learned, and `fill` only proposes values for keys that are missing from a
+locale or still carry that marker.
+"""
+import json
+import os
+import re
+import zlib
+from collections import Counter
+from dataclasses import dataclass
+from functools import lru_cache
+
+from .catalog import BASE_LOCALE, TRANSLATIONS_DIR, flatten, load_catalog, locale_path
+from .manifest import CACHE_DIR, hash_file
+from .merge import add_to_patch
+
+TM_PATH = CACHE_DIR / 'translation-memory.json'
+TM_VERSION = 1
+
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE = 3
+DEFAULT_THRESHOLD = 0.8
+LOOKUP_CACHE_SIZE = 4096
+
+_PRIME = (1 << 61) - 1
+# Fixed coefficients so signatures stored on disk stay valid across runs
+_PERMUTATIONS = [
+    ((1_000_003 * i + 7_919) % _PRIME or 1, (2_654_435_761 * i + 97) % _PRIME)
+    for i in range(1, NUM_PERM + 1)
+]
+_PLACEHOLDER = re.compile(r'\{(\w+)\}')
+_SPACES = re.compile(r'\s+')
+
+
+def normalize(text):
+    return _SPACES.sub(' ', text.strip().lower())
+
+
+@lru_cache(maxsize=LOOKUP_CACHE_SIZE)
+def shingles(text):
+    text = normalize(text)
+    if len(text) <= SHINGLE:
+        return frozenset((text,))
+    return frozenset(text[i:i + SHINGLE] for i in range(len(text) - SHINGLE + 1))
+
+
+def minhash(shingle_set):
+    hashes = [zlib.crc32(shingle.encode('utf-8')) for shingle in shingle_set]
+    return [min((a * h + b) % _PRIME for h in hashes) for a, b in _PERMUTATIONS]
+
+
+@lru_cache(maxsize=LOOKUP_CACHE_SIZE)
+def signature(text):
+    return minhash(shingles(text))
+
+
+def band_keys(sig):
+    return [f'{band}:{hash(tuple(sig[band * ROWS:(band + 1) * ROWS]))}' for band in range(BANDS)]
+
+
+def jaccard(left, right):
+    if not left or not right:
+        return 0.0
+    return len(left & right) / len(left | right)
+
+
+def is_placeholder(value, locale):
+    return f'[{locale.upper()}]' in value
+
+
+@dataclass
+class Match:
+    source: str
+    target: str
+    score: float
+
+    @property
+    def exact(self):
+        return self.score == 1.0
+
+
+class TranslationMemory:
+    def __init__(self, entries=None, signatures=None, source_hashes=None, path=TM_PATH):
+        self.path = path
+        # source text -> {locale: target text}
+        self.entries = entries or {}
+        # source text -> MinHash signature, kept across rebuilds
+        self.signatures = signatures or {}
+        self.source_hashes = source_hashes or {}
+        self._buckets = None
+        self.lookup = lru_cache(maxsize=LOOKUP_CACHE_SIZE)(self._lookup)
+
+    @classmethod
+    def load(cls, path=TM_PATH):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return cls(path=path)
+        if data.get('version') != TM_VERSION:
+            return cls(path=path)
+        return cls(data['entries'], data['signatures'], data['sourceHashes'], path=path)
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f'{self.path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'version': TM_VERSION,
+                'sourceHashes': self.source_hashes,
+                'entries': self.entries,
+                'signatures': self.signatures,
+            }, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_path, self.path)
+
+    def is_current(self, locales, directory=TRANSLATIONS_DIR):
+        return self.source_hashes == {
+            locale: hash_file(locale_path(locale, directory)) for locale in locales
+        }
+
+    def build(self, locales, directory=TRANSLATIONS_DIR, base_locale=BASE_LOCALE):
+        """Re-index every (base -> locale) pair found in the catalogs."""
+        base = dict(flatten(load_catalog(locale_path(base_locale, directory))))
+        votes = {}
+        for locale in locales:
+            if locale == base_locale:
+                continue
+            try:
+                target = dict(flatten(load_catalog(locale_path(locale, directory))))
+            except FileNotFoundError:
+                continue
+            for key, source in base.items():
+                value = target.get(key)
+                if not isinstance(source, str) or not isinstance(value, str) or not source.strip():
+                    continue
+                if is_placeholder(value, locale):
+                    continue
+                votes.setdefault(source, {}).setdefault(locale, Counter())[value] += 1
+
+        # The same source can be translated differently per key; keep the most common
+        self.entries = {
+            source: {locale: counter.most_common(1)[0][0] for locale, counter in by_locale.items()}
+            for source, by_locale in votes.items()
+        }
+        self.signatures = {
+            source: self.signatures.get(source) or signature(source)
+            for source in self.entries
+        }
+        self.source_hashes = {
+            locale: hash_file(locale_path(locale, directory))
+            for locale in sorted(set(locales) | {base_locale})
+        }
+        self._buckets = None
+        self.lookup.cache_clear()
+        return self
+
+    def _index(self):
+        if self._buckets is None:
+            self._buckets = {}
+            for source, sig in self.signatures.items():
+                for band in band_keys(sig):
+                    self._buckets.setdefault(band, []).append(source)
+        return self._buckets
+
+    def candidates(self, text):
+        """Sources sharing at least one LSH band with `text`."""
+        buckets = self._index()
+        found = set()
+        for band in band_keys(signature(text)):
+            found.update(buckets.get(band, ()))
+        return found
+
+    def _lookup(self, text, locale, threshold=DEFAULT_THRESHOLD):
+        targets = self.entries.get(text)
+        if targets and locale in targets:
+            return Match(text, targets[locale], 1.0)
+
+        wanted = shingles(text)
+        variables = set(_PLACEHOLDER.findall(text))
+        best = None
+        for source in self.candidates(text):
+            target = self.entries[source].get(locale)
+            # A near match is only reusable if it interpolates the same variables
+            if target is None or set(_PLACEHOLDER.findall(source)) != variables:
+                continue
+            score = min(jaccard(wanted, shingles(source)), 0.99)
+            if score >= threshold and (best is None or score > best.score):
+                best = Match(source, target, round(score, 3))
+        return best
+
+
+def fill_namespaces(memory, namespaces, locales, directory=TRANSLATIONS_DIR, base_locale=BASE_LOCALE,
+                    threshold=DEFAULT_THRESHOLD, accept_fuzzy=False, placeholders=False):
+    """Propose values for keys in `namespaces` that other locales lack.
+
+    Returns (patch, report): `patch` uses the merge engine's
+    {namespace: {locale: values}} shape; `report` lists every proposal.
+    Fuzzy matches only go into the patch with `accept_fuzzy`, and keys
+    without any match get an `[XX] English` placeholder with `placeholders`.
+    """
+    base = load_catalog(locale_path(base_locale, directory))
+    patch = {}
+    report = []
+
+    for locale in locales:
+        if locale == base_locale:
+            continue
+        try:
+            target = load_catalog(locale_path(locale, directory))
+        except FileNotFoundError:
+            target = {}
+
+        for namespace in namespaces:
+            existing = dict(flatten(target.get(namespace) or {}))
+            for key, source in flatten(base.get(namespace) or {}):
+                current = existing.get(key)
+                if not isinstance(source, str):
+                    continue
+                if isinstance(current, str) and not is_placeholder(current, locale):
+                    continue
+
+                match = memory.lookup(source, locale, threshold)
+                item = {'locale': locale, 'key': f'{namespace}.{key}', 'source': source}
+                if match is None:
+                    item['status'] = 'missing'
+                    if placeholders and current is None:
+                        add_to_patch(patch, namespace, locale, key, f'[{locale.upper()}] {source}')
+                else:
+                    item.update(status='exact' if match.exact else 'fuzzy', score=match.score,
+                                matchedSource=match.source, value=match.target)
+                    if match.exact or accept_fuzzy:
+                        add_to_patch(patch, namespace, locale, key, match.target)
+                report.append(item)
+
+    return patch, report
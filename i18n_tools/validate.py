@@ -0,0 +1,141 @@
+"""
+Completeness and consistency checks for the locale catalogs
+
+Python counterpart of src/lib/i18n/validation.ts. Every catalog is read and
+flattened once into a path -> type index, so comparing a locale against the
+base is a handful of set operations instead of a nested `includes` scan.
+"""
+import time
+
+from .catalog import BASE_LOCALE, TRANSLATIONS_DIR, load_catalog, locale_path
+
+
+def json_type(value):
+    if isinstance(value, dict):
+        return 'object'
+    if isinstance(value, list):
+        return 'array'
+    if isinstance(value, str):
+        return 'string'
+    if isinstance(value, bool):
+        return 'boolean'
+    if value is None:
+        return 'null'
+    return 'number'
+
+
+class CatalogIndex:
+    """Flattened view of one catalog: leaf types plus the set of object paths."""
+
+    def __init__(self, data):
+        self.leaves = {}
+        self.objects = set()
+        self.placeholder_source = {}
+        stack = [('', data)]
+        while stack:
+            path, node = stack.pop()
+            for key, value in node.items():
+                full_key = f'{path}.{key}' if path else key
+                if isinstance(value, dict):
+                    self.objects.add(full_key)
+                    stack.append((full_key, value))
+                else:
+                    self.leaves[full_key] = json_type(value)
+                    if isinstance(value, str):
+                        self.placeholder_source[full_key] = value
+
+    def type_of(self, key):
+        if key in self.objects:
+            return 'object'
+        return self.leaves.get(key)
+
+    def find_placeholders(self, locale):
+        """Keys whose value still carries the `[XX]` marker for `locale`."""
+        marker = f'[{locale.upper()}]'
+        return sorted(key for key, value in self.placeholder_source.items() if marker in value)
+
+
+def changed_keys(old, new):
+    """Key paths whose type, string value or object-ness differs between indexes."""
+    keys = {
+        key for key in old.leaves.keys() | new.leaves.keys()
+        if old.leaves.get(key) != new.leaves.get(key)
+        or old.placeholder_source.get(key) != new.placeholder_source.get(key)
+    }
+    return keys | (old.objects ^ new.objects)
+
+
+def key_issues(base, target, key, locale):
+    """Issues for a single key path, consistent with compare() for that key."""
+    expected = base.type_of(key)
+    actual = target.type_of(key)
+    issues = {}
+    if expected is not None and actual is not None and expected != actual:
+        issues['typeMismatch'] = {'key': key, 'expected': expected, 'actual': actual}
+    elif key in base.leaves and actual is None:
+        issues['missing'] = True
+    elif key in target.leaves and expected is None:
+        issues['extra'] = True
+    if f'[{locale.upper()}]' in target.placeholder_source.get(key, ''):
+        issues['placeholder'] = True
+    return issues
+
+
+def compare(base, target, locale):
+    base_keys = base.leaves.keys()
+    target_keys = target.leaves.keys()
+
+    type_mismatches = []
+    for key in base_keys & (target_keys | target.objects):
+        actual = target.type_of(key)
+        if actual != base.leaves[key]:
+            type_mismatches.append({'key': key, 'expected': base.leaves[key], 'actual': actual})
+    for key in base.objects & target_keys:
+        type_mismatches.append({'key': key, 'expected': 'object', 'actual': target.leaves[key]})
+    mismatched = {item['key'] for item in type_mismatches}
+
+    missing = sorted(key for key in base_keys - target_keys if key not in mismatched)
+    extra = sorted(key for key in target_keys - base_keys if key not in mismatched)
+    type_mismatches.sort(key=lambda item: item['key'])
+    placeholders = target.find_placeholders(locale)
+
+    return {
+        'locale': locale,
+        'isValid': not missing and not type_mismatches,
+        'missingKeys': missing,
+        'extraKeys': extra,
+        'typeMismatches': type_mismatches,
+        'placeholders': placeholders,
+    }
+
+
+def validate_all(locales, directory=TRANSLATIONS_DIR, base_locale=BASE_LOCALE, strict=False):
+    """Validate every locale against the base and return a JSON-ready report.
+
+    With `strict`, extra keys and leftover placeholder markers also make a
+    locale invalid.
+    """
+    start = time.perf_counter()
+    base = CatalogIndex(load_catalog(locale_path(base_locale, directory)))
+
+    results = {}
+    for locale in locales:
+        if locale == base_locale:
+            continue
+        try:
+            target = CatalogIndex(load_catalog(locale_path(locale, directory)))
+        except FileNotFoundError:
+            target = CatalogIndex({})
+        result = compare(base, target, locale)
+        if strict:
+            result['isValid'] = result['isValid'] and not result['extraKeys'] and not result['placeholders']
+        results[locale] = result
+
+    return {
+        'baseLocale': base_locale,
+        'baseKeyCount': len(base.leaves),
+        'isValid': all(result['isValid'] for result in results.values()),
+        'strict': strict,
+        'elapsedMs': round((time.perf_counter() - start) * 1000, 3),
+        'locales': results,
+    }
@@ -0,0 +1,332 @@
+"""
+Change-driven watch mode
+
+Keeps every catalog parsed and indexed in memory, waits for saves to the
+catalogs or to patch sources (inotify on Linux, polling elsewhere), and works
+out which key paths actually changed. Only those keys are re-merged, through
+the streaming patcher, and re-validated in the affected locales. Bursts of
+events from a single editor save are coalesced by a short debounce.
+"""
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import time
+from datetime import datetime
+from pathlib import Path
+
+from .catalog import BASE_LOCALE, TRANSLATIONS_DIR, flatten, load_catalog, locale_path
+from .manifest import hash_bytes
+from .merge import add_to_patch, combine_patches, group_by_locale, load_patch_file
+from .stream import patch_file
+from .validate import CatalogIndex, changed_keys, compare, key_issues
+
+DEFAULT_DEBOUNCE = 0.03
+DEFAULT_POLL_INTERVAL = 0.1
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_DELETE = 0x00000200
+_WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_DELETE
+_EVENT = struct.Struct('iIII')
+
+
+class InotifyWatcher:
+    """Watch the directories holding `paths`; editors often save by rename."""
+
+    def __init__(self, paths):
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        if not hasattr(libc, 'inotify_init1'):
+            raise OSError('inotify is not available')
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+
+        self.paths = {os.path.abspath(path) for path in paths}
+        self.directories = {}
+        for directory in {os.path.dirname(path) for path in self.paths}:
+            wd = libc.inotify_add_watch(self.fd, os.fsencode(directory), _WATCH_MASK)
+            if wd < 0:
+                os.close(self.fd)
+                raise OSError(ctypes.get_errno(), f'cannot watch {directory}')
+            self.directories[wd] = directory
+
+    def read(self, timeout=None):
+        """Return watched paths changed within `timeout` seconds (None blocks)."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+
+        changed = set()
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return changed
+        offset = 0
+        while offset < len(data):
+            wd, _mask, _cookie, length = _EVENT.unpack_from(data, offset)
+            offset += _EVENT.size
+            name = data[offset:offset + length].rstrip(b'\0')
+            offset += length
+            path = os.path.join(self.directories.get(wd, ''), os.fsdecode(name))
+            if path in self.paths:
+                changed.add(path)
+        return changed
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PollingWatcher:
+    def __init__(self, paths, interval=DEFAULT_POLL_INTERVAL):
+        self.paths = {os.path.abspath(path) for path in paths}
+        self.interval = interval
+        self.stats = {path: self._stat(path) for path in self.paths}
+
+    @staticmethod
+    def _stat(path):
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def read(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            changed = set()
+            for path in self.paths:
+                stat = self._stat(path)
+                if stat != self.stats[path]:
+                    self.stats[path] = stat
+                    changed.add(path)
+            if changed:
+                return changed
+            if deadline is not None and time.monotonic() >= deadline:
+                return changed
+            delay = self.interval if deadline is None else min(self.interval, max(deadline - time.monotonic(), 0))
+            time.sleep(delay)
+
+    def close(self):
+        pass
+
+
+def make_watcher(paths, polling=False, interval=DEFAULT_POLL_INTERVAL):
+    if not polling:
+        try:
+            return InotifyWatcher(paths)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(paths, interval)
+
+
+def flatten_patches(patches):
+    """{(locale, namespace, key): value} for every leaf of the patches."""
+    return {
+        (locale, namespace, key): value
+        for namespace, by_locale in patches.items()
+        for locale, values in by_locale.items()
+        for key, value in flatten(values)
+    }
+
+
+class LocaleReport:
+    """Validation issues for one locale, updatable key by key."""
+
+    def __init__(self, result):
+        self.missing = set(result['missingKeys'])
+        self.extra = set(result['extraKeys'])
+        self.mismatches = {item['key']: item for item in result['typeMismatches']}
+        self.placeholders = set(result['placeholders'])
+
+    def update(self, base, target, locale, keys):
+        for key in keys:
+            self.missing.discard(key)
+            self.extra.discard(key)
+            self.mismatches.pop(key, None)
+            self.placeholders.discard(key)
+
+            issues = key_issues(base, target, key, locale)
+            if 'missing' in issues:
+                self.missing.add(key)
+            if 'extra' in issues:
+                self.extra.add(key)
+            if 'typeMismatch' in issues:
+                self.mismatches[key] = issues['typeMismatch']
+            if 'placeholder' in issues:
+                self.placeholders.add(key)
+
+    def counts(self):
+        return len(self.missing), len(self.extra), len(self.mismatches), len(self.placeholders)
+
+
+class WatchSession:
+    def __init__(self, locales, directory=TRANSLATIONS_DIR, patch_paths=(), builtin_patches=None,
+                 base_locale=BASE_LOCALE):
+        self.locales = list(locales)
+        if base_locale not in self.locales:
+            self.locales.insert(0, base_locale)
+        self.directory = directory
+        self.patch_paths = [os.path.abspath(path) for path in patch_paths]
+        self.builtin_patches = builtin_patches or {}
+        self.base_locale = base_locale
+
+        self.paths = {os.path.abspath(locale_path(locale, directory)): locale for locale in self.locales}
+        self.hashes = {}
+        self.indexes = {}
+        self.reports = {}
+        self.patch_sources = {}
+
+    def watched_paths(self):
+        return list(self.paths) + self.patch_paths
+
+    def _read_catalog(self, locale):
+        """Re-index `locale` from disk; returns the changed keys, or None if unchanged."""
+        path = locale_path(locale, self.directory)
+        try:
+            raw = Path(path).read_bytes()
+        except FileNotFoundError:
+            raw = b''
+        digest = hash_bytes(raw)
+        if self.hashes.get(locale) == digest:
+            return None
+
+        try:
+            index = CatalogIndex(load_catalog(path) if raw else {})
+        except ValueError:
+            # Mid-save or broken JSON; wait for the next event
+            return None
+        self.hashes[locale] = digest
+        old = self.indexes.get(locale)
+        self.indexes[locale] = index
+        return set(index.leaves) | index.objects if old is None else changed_keys(old, index)
+
+    def _load_patches(self):
+        sources = [self.builtin_patches]
+        for path in self.patch_paths:
+            try:
+                sources.append(load_patch_file(path))
+            except FileNotFoundError:
+                continue
+            except ValueError as error:
+                raise ValueError(f'{path}: {error}') from error
+        return flatten_patches(combine_patches(*sources))
+
+    def _apply(self, entries):
+        """Stream `entries` into their catalogs; returns {locale: changed keys}."""
+        patch = {}
+        for (locale, namespace, key), value in entries.items():
+            if locale in self.paths.values():
+                add_to_patch(patch, namespace, locale, key, value)
+
+        changed = {}
+        for locale, namespaces in group_by_locale(patch).items():
+            patch_file(locale_path(locale, self.directory), namespaces)
+            keys = self._read_catalog(locale)
+            if keys:
+                changed[locale] = keys
+        return changed
+
+    def _revalidate(self, changed):
+        """Re-check only the changed keys; an edit to the base touches every locale."""
+        base = self.indexes[self.base_locale]
+        affected = {}
+        base_keys = changed.get(self.base_locale, set())
+        for locale in self.locales:
+            if locale == self.base_locale:
+                continue
+            keys = base_keys | changed.get(locale, set())
+            if keys:
+                self.reports[locale].update(base, self.indexes[locale], locale, keys)
+                affected[locale] = len(keys)
+        return affected
+
+    def start(self):
+        """Load every catalog, apply the current patches and validate everything."""
+        for locale in self.locales:
+            self._read_catalog(locale)
+        self.patch_sources = self._load_patches()
+        self._apply(self.patch_sources)
+
+        base = self.indexes[self.base_locale]
+        self.reports = {
+            locale: LocaleReport(compare(base, self.indexes[locale], locale))
+            for locale in self.locales if locale != self.base_locale
+        }
+
+    def handle(self, paths):
+        """Process one debounced batch of changed paths; returns a summary dict."""
+        changed = {}
+        patch_changes = 0
+        if any(path in self.patch_paths for path in paths):
+            patches = self._load_patches()
+            entries = {
+                entry: value for entry, value in patches.items()
+                if self.patch_sources.get(entry, object()) != value
+            }
+            self.patch_sources = patches
+            patch_changes = len(entries)
+            for locale, keys in self._apply(entries).items():
+                changed.setdefault(locale, set()).update(keys)
+
+        for path in paths:
+            locale = self.paths.get(path)
+            if locale is None:
+                continue
+            keys = self._read_catalog(locale)
+            if keys:
+                changed.setdefault(locale, set()).update(keys)
+
+        return {
+            'patchEntries': patch_changes,
+            'changed': {locale: len(keys) for locale, keys in changed.items()},
+            'revalidated': self._revalidate(changed),
+        }
+
+    def print_status(self, locales=None):
+        for locale in locales or [locale for locale in self.locales if locale != self.base_locale]:
+            missing, extra, mismatches, placeholders = self.reports[locale].counts()
+            status = 'OK' if not missing and not mismatches else 'FAIL'
+            print(f'  {locale.upper()}: {status} - {missing} missing, {extra} extra, '
+                  f'{mismatches} type mismatch(es), {placeholders} placeholder(s)')
+
+
+def watch(session, debounce=DEFAULT_DEBOUNCE, polling=False, interval=DEFAULT_POLL_INTERVAL):
+    """Run until interrupted, handling each burst of saves as one batch."""
+    start = time.perf_counter()
+    session.start()
+    print(f'Loaded {len(session.locales)} catalog(s) in {(time.perf_counter() - start) * 1000:.1f} ms')
+    session.print_status()
+
+    watcher = make_watcher(session.watched_paths(), polling, interval)
+    print(f'Watching {len(session.watched_paths())} file(s) with {type(watcher).__name__} (Ctrl+C to stop)')
+    try:
+        while True:
+            paths = watcher.read()
+            # Editors save in bursts; wait until things go quiet
+            while True:
+                more = watcher.read(debounce)
+                if not more:
+                    break
+                paths |= more
+
+            start = time.perf_counter()
+            try:
+                summary = session.handle(paths)
+            except (OSError, ValueError) as error:
+                print(f'error: {error}')
+                continue
+            elapsed = (time.perf_counter() - start) * 1000
+
+            if not summary['changed']:
+                continue
+            stamp = datetime.now().strftime('%H:%M:%S')
+            changed = ', '.join(f'{locale} ({count} keys)' for locale, count in sorted(summary['changed'].items()))
+            note = f", {summary['patchEntries']} patch entr(ies) applied" if summary['patchEntries'] else ''
+            print(f'[{stamp}] changed: {changed}{note}; revalidated in {elapsed:.1f} ms')
+            session.print_status(sorted(summary['revalidated']))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
@@ -1,6 +1,6 @@
 'use client';
 
-import { createContext, useContext, useState, useEffect, ReactNode } from 'react';
+import { createContext, useContext, useState, useEffect, useMemo, ReactNode } from 'react';
 import type { Locale } from '@/lib/i18n';
 import { defaultLocale, getTranslations, isRTL } from '@/lib/i18n';
 import { getTranslationWithWarning } from '@/lib/i18n/validation';
@@ -15,6 +15,24 @@ interface I18nContextType {
   loading: boolean;
 }
 
+/**
+ * Flatten nested translations into a dotted key -> string map
+ */
+function flattenTranslations(obj: any, prefix = '', table: Record<string, string> = {}): Record<string, string> {
+  for (const key in obj) {
+    const fullKey = prefix ? `${prefix}.${key}` : key;
+    const value = obj[key];
+    
+    if (typeof value === 'string') {
+      table[fullKey] = value;
+    } else if (value && typeof value === 'object' && !Array.isArray(value)) {
+      flattenTranslations(value, fullKey, table);
+    }
+  }
+  
+  return table;
+}
+
 const I18nContext = createContext<I18nContextType | undefined>(undefined);
 
 export function I18nProvider({ children, initialLocale, initialTranslations }: { 
@@ -80,25 +98,17 @@ export function I18nProvider({ children, initialLocale, initialTranslations }: {
     }
   }, [locale]);
 
+  // Flattened once per catalog so t() is a single lookup per key
+  const flatTranslations = useMemo(() => flattenTranslations(translations), [translations]);
+
   const t = (key: string): string => {
     // Use validation function in development mode for warnings
     if (process.env.NODE_ENV === 'development') {
       return getTranslationWithWarning(translations, key, locale);
     }
     
-    // Production mode - simple lookup
-    const keys = key.split('.');
-    let value: any = translations;
-    
-    for (const k of keys) {
-      if (value && typeof value === 'object' && k in value) {
-        value = value[k];
-      } else {
-        return key; // Return key if translation not found
-      }
-    }
-    
-    return typeof value === 'string' ? value : key;
+    // Production mode - flat lookup, returning the key if translation not found
+    return Object.prototype.hasOwnProperty.call(flatTranslations, key) ? flatTranslations[key] : key;
   };
 
   return (
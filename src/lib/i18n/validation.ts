@@ -37,12 +37,14 @@ export async function validateTranslations(locale: Locale): Promise<ValidationRe
     
     const baseKeys = getAllKeys(baseTranslations.default);
     const targetKeys = getAllKeys(targetTranslations.default);
+    const baseKeySet = new Set(baseKeys);
+    const targetKeySet = new Set(targetKeys);
     
     // Find missing keys (in base but not in target)
-    const missingKeys = baseKeys.filter(key => !targetKeys.includes(key));
+    const missingKeys = baseKeys.filter(key => !targetKeySet.has(key));
     
     // Find extra keys (in target but not in base)
-    const extraKeys = targetKeys.filter(key => !baseKeys.includes(key));
+    const extraKeys = targetKeys.filter(key => !baseKeySet.has(key));
     
     const isValid = missingKeys.length === 0;
     